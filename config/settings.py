@@ -19,6 +19,9 @@ class Settings:
     # MODEL_NAME = "llama3-8b-8192"
     MODEL_NAME = "deepseek/deepseek-chat-v3-0324:free"
     
+    # Chat completions endpoint, overridable to point at a local stub for load testing
+    OPENROUTER_BASE_URL = os.getenv("OPENROUTER_BASE_URL", "https://openrouter.ai/api/v1/chat/completions")
+    
     # Chunk size for document splitting (words), balances context and performance
     CHUNK_SIZE = 300
     
@@ -27,6 +30,33 @@ class Settings:
     
     # Path to Nigerian Constitution PDF, update this before running
     CONSTITUTION_PATH = "Constitution-of-the-Federal-Republic-of-Nigeria.pdf"
+    
+    # Binary chunk corpus written by preprocessing and loaded by the vector store
+    CHUNKS_PATH = os.getenv("CHUNKS_PATH", "constitution_chunks.bin")
+    
+    # Sentence embedding model for dense retrieval (and precomputed corpus embeddings)
+    EMBEDDING_MODEL = "all-MiniLM-L6-v2"
+    
+    # SQLite file for cached LLM responses, survives restarts
+    RESPONSE_CACHE_PATH = os.getenv("RESPONSE_CACHE_PATH", "lexai_response_cache.db")
+    
+    # Maximum cached responses before least recently used ones are evicted
+    RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "5000"))
+    
+    # Seconds a cached response stays valid (default one week)
+    RESPONSE_CACHE_TTL = int(os.getenv("RESPONSE_CACHE_TTL", str(7 * 24 * 3600)))
+    
+    # Token for /admin endpoints and the X-LEXAI-Profile header; admin features are off when unset
+    ADMIN_TOKEN = os.getenv("ADMIN_TOKEN")
+    
+    # Fraction of /query requests profiled automatically (0 disables sampling)
+    PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))
+    
+    # Seconds between stack samples while a profile is running
+    PROFILE_INTERVAL = float(os.getenv("PROFILE_INTERVAL", "0.005"))
+    
+    # Track allocations with tracemalloc while building the index (slows startup)
+    PROFILE_INDEX_ALLOCATIONS = os.getenv("PROFILE_INDEX_ALLOCATIONS", "0") == "1"
 
 # Instantiate settings for global access
 settings = Settings()
\ No newline at end of file
@@ -1,10 +1,13 @@
 # Purpose: Manages queries and sessions, coordinating model components.
 # Why: Explicitly separates control logic for modularity.
 
-from model.rag.rag_agent import LEXAIRagAgent
+import hashlib
+from model.rag.rag_agent import LEXAIRagAgent, SYSTEM_PROMPT
 # from model.database.chat_history import ChatHistoryDB
+from model.database.response_cache import ResponseCache
 from model.vector_store.tfidf_store import VectorStoreManager
 from model.llm.groq_llm import GroqLLM
+from config.settings import settings
 from utils.logger import logger
 
 class QueryHandler:
@@ -12,13 +15,29 @@ class QueryHandler:
     
     def __init__(self):
         """Initializes the handler with all necessary components."""
-        # Initialize vector store (loads from constitution_chunks.json)
+        # Initialize vector store (loads from constitution_chunks.bin)
         self.vector_store_manager = VectorStoreManager()
         
         # Initialize LLM and session storage
         self.llm = GroqLLM()
         # self.chat_db = ChatHistoryDB()
         self.sessions = {}  # Dictionary to store session agents
+        
+        # Response cache, invalidated whenever the index or system prompt changes.
+        # If it can't be opened (e.g. a read-only working directory), run without it.
+        fingerprint = hashlib.sha256(
+            (self.vector_store_manager.index_fingerprint + SYSTEM_PROMPT).encode("utf-8")
+        ).hexdigest()
+        try:
+            self.response_cache = ResponseCache(
+                settings.RESPONSE_CACHE_PATH,
+                fingerprint,
+                max_entries=settings.RESPONSE_CACHE_MAX_ENTRIES,
+                ttl=settings.RESPONSE_CACHE_TTL
+            )
+        except Exception as e:
+            logger.warning(f"Response cache unavailable, continuing without it: {str(e)}")
+            self.response_cache = None
     
     def handle_query(self, session_id, query):
         """Processes a query for a given session.
@@ -33,17 +52,29 @@ class QueryHandler:
         if session_id not in self.sessions:
             self.sessions[session_id] = LEXAIRagAgent(
                 llm=self.llm.get_llm(),  # Pass the GroqModel instance directly
-                vector_store=self.vector_store_manager.get_vector_store()
+                vector_store=self.vector_store_manager.get_vector_store(),
+                response_cache=self.response_cache
             )
             logger.info(f"Created new session: {session_id}")
         
         agent = self.sessions[session_id]
         
-        # Use hybrid retrieval
-        results = self.vector_store_manager.hybrid_retrieve(query, top_k=5)
+        # Citation-style queries ("what does section 33 say") hit the section index directly;
+        # cited sections are passed whole so the LLM never sees a partial section
+        results = self.vector_store_manager.section_lookup(query)
+        if results:
+            logger.info(f"Answered from section index with {len(results)} chunks")
+        else:
+            # Use hybrid retrieval
+            results = self.vector_store_manager.hybrid_retrieve(query, top_k=5)
         context = "\n".join([doc.content for doc in results])
+        cache_key = ResponseCache.make_key(
+            query,
+            [doc.metadata['chunk_id'] for doc in results],
+            self.llm.model_name
+        )
         
         # Pass context to agent
-        response = agent.execute(query, context)
+        response = agent.execute(query, context, cache_key=cache_key)
         # self.chat_db.save_chat(session_id, query, response)
         return response
\ No newline at end of file
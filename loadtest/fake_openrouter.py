@@ -0,0 +1,85 @@
+# Purpose: Local stand-in for the OpenRouter chat completions API.
+# Why: Load tests must not depend on (or pay for) the real API, and need controllable
+#      latency, errors and rate limiting to see how LEXAI behaves under each.
+
+import asyncio
+import os
+import random
+import threading
+import time
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse
+
+class FakeLLMConfig:
+    """Behaviour of the fake API, read from environment variables."""
+    # Mean response latency in seconds
+    LATENCY = float(os.getenv("FAKE_LLM_LATENCY", "0.5"))
+    
+    # Uniform jitter added to or removed from the latency, in seconds
+    JITTER = float(os.getenv("FAKE_LLM_JITTER", "0.1"))
+    
+    # Fraction of requests answered with HTTP 500
+    ERROR_RATE = float(os.getenv("FAKE_LLM_ERROR_RATE", "0"))
+    
+    # Requests per second allowed before answering HTTP 429 (0 disables the limit)
+    RATE_LIMIT = float(os.getenv("FAKE_LLM_RATE_LIMIT", "0"))
+
+config = FakeLLMConfig()
+
+app = FastAPI(title="Fake OpenRouter")
+
+# Token bucket for the rate limit, refilled continuously at RATE_LIMIT per second.
+# It holds at least one token so limits below 1 req/s (e.g. 0.33 for 20 per minute) still admit requests.
+_capacity = max(1.0, config.RATE_LIMIT)
+_bucket = {"tokens": _capacity, "updated": time.monotonic()}
+_bucket_lock = threading.Lock()
+_counters = {"requests": 0, "errors": 0, "rate_limited": 0}
+
+def _take_token():
+    """Returns False when the request exceeds the configured rate limit."""
+    if config.RATE_LIMIT <= 0:
+        return True
+    with _bucket_lock:
+        now = time.monotonic()
+        _bucket["tokens"] = min(
+            _capacity,
+            _bucket["tokens"] + (now - _bucket["updated"]) * config.RATE_LIMIT
+        )
+        _bucket["updated"] = now
+        if _bucket["tokens"] < 1:
+            return False
+        _bucket["tokens"] -= 1
+        return True
+
+@app.post("/api/v1/chat/completions")
+async def chat_completions(payload: dict):
+    """Mimics an OpenRouter chat completion with configurable latency and failures."""
+    _counters["requests"] += 1
+    if not _take_token():
+        _counters["rate_limited"] += 1
+        return JSONResponse(status_code=429, content={"error": {"message": "Rate limit exceeded"}})
+    
+    await asyncio.sleep(max(0.0, config.LATENCY + random.uniform(-config.JITTER, config.JITTER)))
+    
+    if random.random() < config.ERROR_RATE:
+        _counters["errors"] += 1
+        return JSONResponse(status_code=500, content={"error": {"message": "Injected failure"}})
+    
+    messages = payload.get("messages", [])
+    prompt_tokens = sum(len(str(m.get("content", "")).split()) for m in messages)
+    content = f"Stub answer from {payload.get('model')} for: {messages[-1]['content'] if messages else ''}"
+    return {
+        "id": f"fake-{_counters['requests']}",
+        "model": payload.get("model"),
+        "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+        "usage": {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": len(content.split()),
+            "total_tokens": prompt_tokens + len(content.split())
+        }
+    }
+
+@app.get("/stats")
+async def stats():
+    """Returns how many requests the fake API served, failed and rate limited."""
+    return _counters
@@ -0,0 +1,313 @@
+# Purpose: Drives concurrent load against the LEXAI API backed by a local fake OpenRouter.
+# Why: Measures throughput, tail latency, error rates and memory growth offline, and keeps
+#      the results on disk so regressions between releases are visible.
+#
+# Usage: python -m loadtest.load_test --concurrency 8 --sessions 20 --queries-per-session 5
+
+import argparse
+import json
+import math
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+import requests
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+
+# Free-text questions go through hybrid retrieval
+FREE_TEXT_QUERIES = [
+    "What are my fundamental human rights?",
+    "How is the president elected?",
+    "What are the requirements to run for governor?",
+    "Explain the judicial appointment process",
+    "What is the role of the National Assembly?",
+    "Can I own land in Nigeria?",
+    "Can the police detain me without trial?",
+    "Who can become a citizen of Nigeria?"
+]
+
+# Citation-style questions are answered from the section index
+CITATION_QUERIES = [
+    "What does section 33 say?",
+    "Explain section 39",
+    "What is in sections 35 and 36?",
+    "Summarize section 131",
+    "What does section 318 define?"
+]
+
+def free_port():
+    """Returns a free local TCP port."""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def rss_bytes(pid):
+    """Returns the resident memory of a process in bytes, or None if unavailable."""
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return None
+
+def start_server(module, port, env):
+    """Starts a uvicorn server for module:app in a subprocess."""
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", f"{module}:app", "--host", "127.0.0.1", "--port", str(port),
+         "--log-level", "warning"],
+        cwd=ROOT_DIR,
+        env=env
+    )
+
+def wait_for(url, process, timeout):
+    """Polls url until it answers 200, failing early if the server process exits."""
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"Server exited with code {process.returncode} before {url} came up")
+        try:
+            if requests.get(url, timeout=2).status_code == 200:
+                return
+        except requests.RequestException:
+            pass
+        time.sleep(0.5)
+    raise RuntimeError(f"Timed out waiting for {url}")
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return None
+    rank = max(0, min(len(sorted_values) - 1, math.ceil(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[rank]
+
+def build_workload(args):
+    """Builds the (session_id, query) list for the run, shuffled across sessions."""
+    rng = random.Random(args.seed)
+    workload = []
+    for session in range(args.sessions):
+        for _ in range(args.queries_per_session):
+            pool = CITATION_QUERIES if rng.random() < args.citation_ratio else FREE_TEXT_QUERIES
+            workload.append((f"load_{session}", rng.choice(pool)))
+    # Mix sessions together so concurrent clients talk to different sessions
+    if args.interleave:
+        rng.shuffle(workload)
+    return workload
+
+def run_load(base_url, workload, concurrency, server_pid):
+    """Sends the workload with the given concurrency and collects per-request results."""
+    results = []
+    results_lock = threading.Lock()
+    memory = []
+    seen_sessions = set()
+    session_locks = {session_id: threading.Lock() for session_id, _ in workload}
+    http = threading.local()
+    
+    def send(item):
+        session_id, query = item
+        if not hasattr(http, "session"):
+            http.session = requests.Session()
+        # One in-flight request per session, like a real chat client
+        with session_locks[session_id]:
+            started = time.perf_counter()
+            try:
+                response = http.session.post(
+                    f"{base_url}/query",
+                    json={"query": query, "session_id": session_id},
+                    timeout=120
+                )
+                status = response.status_code
+                # The agent reports LLM failures inside a 200 response
+                failed = status != 200 or response.json().get("response", "").startswith("ERROR:")
+            except requests.RequestException:
+                status = None
+                failed = True
+            elapsed = time.perf_counter() - started
+        with results_lock:
+            results.append({"latency": elapsed, "status": status, "failed": failed})
+            if session_id not in seen_sessions:
+                seen_sessions.add(session_id)
+                memory.append((len(seen_sessions), rss_bytes(server_pid)))
+    
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(send, workload))
+    duration = time.perf_counter() - started
+    return results, memory, duration
+
+def summarize(results, memory, duration, rss_before, rss_after):
+    """Turns raw request results into the report stored on disk."""
+    latencies = sorted(r["latency"] for r in results)
+    statuses = {}
+    for r in results:
+        key = str(r["status"])
+        statuses[key] = statuses.get(key, 0) + 1
+    failures = sum(1 for r in results if r["failed"])
+    sessions = memory[-1][0] if memory else 0
+    growth = None
+    if rss_before is not None and rss_after is not None and sessions:
+        growth = (rss_after - rss_before) / sessions
+    return {
+        "requests": len(results),
+        "duration_s": round(duration, 3),
+        "rps": round(len(results) / duration, 3) if duration else None,
+        "latency_s": {
+            "p50": percentile(latencies, 50),
+            "p95": percentile(latencies, 95),
+            "p99": percentile(latencies, 99),
+            "max": latencies[-1] if latencies else None
+        },
+        "error_rate": failures / len(results) if results else 0.0,
+        "status_codes": statuses,
+        "memory": {
+            "rss_before_bytes": rss_before,
+            "rss_after_bytes": rss_after,
+            "growth_per_session_bytes": growth,
+            "samples": [{"sessions": n, "rss_bytes": rss} for n, rss in memory]
+        }
+    }
+
+def git_revision():
+    """Returns the current git commit, so results can be lined up with releases."""
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT_DIR, stderr=subprocess.DEVNULL
+        ).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def previous_result(label, response_cache):
+    """Loads the most recent saved result with the same label and cache setting, if any.
+    
+    Runs with the response cache on mostly measure cache hits, so they are
+    never compared against runs with it off.
+    """
+    if not os.path.isdir(RESULTS_DIR):
+        return None
+    candidates = sorted(f for f in os.listdir(RESULTS_DIR) if f.startswith(f"{label}_") and f.endswith(".json"))
+    for name in reversed(candidates):
+        with open(os.path.join(RESULTS_DIR, name), encoding="utf-8") as f:
+            result = json.load(f)
+        if result.get("config", {}).get("response_cache", False) == response_cache:
+            return result
+    return None
+
+def print_report(report, previous):
+    """Prints the headline numbers, with deltas against the previous run."""
+    summary = report["summary"]
+    
+    def delta(current, old):
+        if previous is None or current is None or old is None or old == 0:
+            return ""
+        return f" ({(current - old) / old * 100:+.1f}% vs {previous.get('revision') or 'previous'})"
+    
+    old = previous["summary"] if previous else {}
+    old_latency = old.get("latency_s", {})
+    print(f"Requests: {summary['requests']} in {summary['duration_s']}s")
+    print(f"RPS: {summary['rps']}{delta(summary['rps'], old.get('rps'))}")
+    for key in ("p50", "p95", "p99"):
+        value = summary["latency_s"][key]
+        print(f"{key}: {value:.3f}s{delta(value, old_latency.get(key))}" if value is not None else f"{key}: n/a")
+    print(f"Error rate: {summary['error_rate']:.2%} {summary['status_codes']}")
+    hit_rate = summary["response_cache_hit_rate"]
+    print(f"Response cache: {'off' if hit_rate is None else f'{hit_rate:.2%} hit rate'}")
+    growth = summary["memory"]["growth_per_session_bytes"]
+    if growth is not None:
+        print(f"Memory growth per session: {growth / 1024:.1f} KiB")
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test LEXAI against a local fake OpenRouter")
+    parser.add_argument("--concurrency", type=int, default=8, help="Concurrent client threads")
+    parser.add_argument("--sessions", type=int, default=20, help="Distinct chat sessions")
+    parser.add_argument("--queries-per-session", type=int, default=5, help="Queries sent per session")
+    parser.add_argument("--citation-ratio", type=float, default=0.2,
+                        help="Fraction of citation-style queries (served from the section index)")
+    parser.add_argument("--no-interleave", dest="interleave", action="store_false",
+                        help="Send each session's queries back to back instead of interleaving sessions")
+    parser.add_argument("--llm-latency", type=float, default=0.5, help="Fake LLM mean latency in seconds")
+    parser.add_argument("--llm-jitter", type=float, default=0.1, help="Fake LLM latency jitter in seconds")
+    parser.add_argument("--llm-error-rate", type=float, default=0.0, help="Fraction of fake LLM calls failing with 500")
+    parser.add_argument("--llm-rate-limit", type=float, default=0.0,
+                        help="Fake LLM requests per second before 429s (0 disables)")
+    parser.add_argument("--response-cache", action=argparse.BooleanOptionalAction, default=False,
+                        help="Keep the LLM response cache on; off by default so capacity runs exercise the LLM")
+    parser.add_argument("--startup-timeout", type=int, default=600, help="Seconds to wait for the API to load")
+    parser.add_argument("--label", default="default", help="Name results are saved and compared under")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for the query mix")
+    args = parser.parse_args()
+    
+    fake_port = free_port()
+    api_port = free_port()
+    base_env = dict(os.environ)
+    fake_env = dict(
+        base_env,
+        FAKE_LLM_LATENCY=str(args.llm_latency),
+        FAKE_LLM_JITTER=str(args.llm_jitter),
+        FAKE_LLM_ERROR_RATE=str(args.llm_error_rate),
+        FAKE_LLM_RATE_LIMIT=str(args.llm_rate_limit)
+    )
+    # Fresh response cache per run so repeated runs are comparable
+    cache_dir = tempfile.mkdtemp(prefix="lexai_load_")
+    api_env = dict(
+        base_env,
+        OPENROUTER_API_KEY=base_env.get("OPENROUTER_API_KEY", "load-test"),
+        OPENROUTER_BASE_URL=f"http://127.0.0.1:{fake_port}/api/v1/chat/completions",
+        RESPONSE_CACHE_PATH=os.path.join(cache_dir, "response_cache.db")
+    )
+    if not args.response_cache:
+        # With a zero cap every entry is evicted on write, so every lookup misses
+        api_env["RESPONSE_CACHE_MAX_ENTRIES"] = "0"
+    
+    fake_server = start_server("loadtest.fake_openrouter", fake_port, fake_env)
+    api_server = None
+    try:
+        wait_for(f"http://127.0.0.1:{fake_port}/stats", fake_server, 30)
+        print("Starting LEXAI API (loading the index can take a while)...")
+        api_server = start_server("view.api.endpoints", api_port, api_env)
+        base_url = f"http://127.0.0.1:{api_port}"
+        wait_for(f"{base_url}/health", api_server, args.startup_timeout)
+        
+        workload = build_workload(args)
+        rss_before = rss_bytes(api_server.pid)
+        results, memory, duration = run_load(base_url, workload, args.concurrency, api_server.pid)
+        rss_after = rss_bytes(api_server.pid)
+        
+        cache_stats = requests.get(f"{base_url}/cache/stats", timeout=5).json()
+        summary = summarize(results, memory, duration, rss_before, rss_after)
+        summary["response_cache_hit_rate"] = cache_stats.get("hit_rate") if args.response_cache else None
+        report = {
+            "label": args.label,
+            "revision": git_revision(),
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "config": vars(args),
+            "summary": summary,
+            "fake_llm": requests.get(f"http://127.0.0.1:{fake_port}/stats", timeout=5).json(),
+            "response_cache": cache_stats
+        }
+    finally:
+        for server in (api_server, fake_server):
+            if server is not None:
+                server.terminate()
+                server.wait(timeout=30)
+    
+    previous = previous_result(args.label, args.response_cache)
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    path = os.path.join(RESULTS_DIR, f"{args.label}_{stamp}.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    
+    print_report(report, previous)
+    print(f"Saved results to {path}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,309 @@
+# Purpose: Compact binary corpus format for Constitution chunks, read through mmap.
+# Why: The pretty-printed JSON had to be fully parsed into dicts on every startup; this
+#      format is memory-mapped and read in place, with optional precomputed embeddings.
+#
+# Layout (little-endian, sections aligned to 8 bytes, embeddings to 16):
+#   header          magic "LEXC", version, flags, counts and section offsets (HEADER)
+#   string index    u64[string_count + 1] offsets into the string blob
+#   string blob     UTF-8 chapter/part/section labels and the embedding model name
+#   section refs    u32 string ids, referenced by (sections_start, sections_count)
+#   metadata table  METADATA_DTYPE[count], one fixed-width record per chunk
+#   text index      u64[count] file offsets of each text record
+#   text section    per chunk: u32 byte length followed by UTF-8 content
+#   embeddings      optional float16/float32[count, dim]
+
+import argparse
+import json
+import mmap
+import os
+import struct
+import sys
+import numpy as np
+
+# Dynamically adjust path to include project root when run directly
+if __name__ == "__main__":
+    sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from utils.logger import logger
+
+MAGIC = b"LEXC"
+VERSION = 1
+
+# Flag bits
+HAS_EMBEDDINGS = 1
+FLOAT16_EMBEDDINGS = 2
+
+# magic, version, flags, count, dim, string_count, embedding_model string id,
+# then offsets of: string index, string blob, section refs, metadata, text index, text, embeddings
+HEADER = struct.Struct("<4sHHIIII7Q")
+
+METADATA_DTYPE = np.dtype([
+    ("chapter", "<u4"),
+    ("part", "<u4"),
+    ("page_start", "<u2"),
+    ("page_end", "<u2"),
+    ("is_fundamental_rights", "u1"),
+    ("pad", "u1", 3),
+    ("sections_start", "<u4"),
+    ("sections_count", "<u4")
+])
+
+# Sentinels for missing values
+NO_STRING = 0xFFFFFFFF
+NO_PAGE = 0xFFFF
+
+def _pad(buffer, alignment=8):
+    """Pads the buffer with zero bytes up to the next multiple of alignment."""
+    buffer.extend(b"\0" * (-len(buffer) % alignment))
+    return len(buffer)
+
+def write_chunks(chunks, path, embeddings=None, embedding_model=None, dtype="float16"):
+    """Writes chunks (and optionally their embeddings) in the binary corpus format.
+    
+    Args:
+        chunks (list): Dicts with "content" and "metadata", as produced by DocumentManager.
+        path (str): Output file.
+        embeddings (array): Optional [len(chunks), dim] embedding matrix.
+        embedding_model (str): Name of the model that produced the embeddings.
+        dtype (str): "float16" or "float32" storage for embeddings.
+    """
+    strings = []
+    string_ids = {}
+    
+    def intern(value):
+        if value is None:
+            return NO_STRING
+        if value not in string_ids:
+            string_ids[value] = len(strings)
+            strings.append(value)
+        return string_ids[value]
+    
+    records = np.zeros(len(chunks), dtype=METADATA_DTYPE)
+    section_refs = []
+    for i, chunk in enumerate(chunks):
+        metadata = chunk["metadata"]
+        sections = metadata.get("sections", [])
+        page_start = metadata.get("page_start")
+        page_end = metadata.get("page_end")
+        records[i] = (
+            intern(metadata.get("chapter", "UNKNOWN")),
+            intern(metadata.get("part")),
+            NO_PAGE if page_start is None else page_start,
+            NO_PAGE if page_end is None else page_end,
+            metadata.get("is_fundamental_rights", 0),
+            (0, 0, 0),
+            len(section_refs),
+            len(sections)
+        )
+        section_refs.extend(intern(section) for section in sections)
+    
+    dim = 0
+    flags = 0
+    model_id = NO_STRING
+    if embeddings is not None:
+        embeddings = np.asarray(embeddings, dtype="<f2" if dtype == "float16" else "<f4")
+        if embeddings.shape[0] != len(chunks):
+            raise ValueError("Embeddings must have one row per chunk")
+        dim = embeddings.shape[1]
+        flags |= HAS_EMBEDDINGS | (FLOAT16_EMBEDDINGS if dtype == "float16" else 0)
+        model_id = intern(embedding_model or "")
+    
+    encoded = [s.encode("utf-8") for s in strings]
+    string_index = np.zeros(len(encoded) + 1, dtype="<u8")
+    np.cumsum([len(s) for s in encoded], out=string_index[1:])
+    
+    body = bytearray(HEADER.size)
+    strings_index_offset = _pad(body)
+    body.extend(string_index.tobytes())
+    strings_blob_offset = _pad(body)
+    body.extend(b"".join(encoded))
+    section_refs_offset = _pad(body)
+    body.extend(np.asarray(section_refs, dtype="<u4").tobytes())
+    metadata_offset = _pad(body)
+    body.extend(records.tobytes())
+    
+    text_index_offset = _pad(body)
+    body.extend(b"\0" * (8 * len(chunks)))
+    text_offset = _pad(body)
+    text_index = np.zeros(len(chunks), dtype="<u8")
+    for i, chunk in enumerate(chunks):
+        content = chunk["content"].encode("utf-8")
+        text_index[i] = len(body)
+        body.extend(struct.pack("<I", len(content)))
+        body.extend(content)
+    body[text_index_offset:text_index_offset + 8 * len(chunks)] = text_index.tobytes()
+    
+    embeddings_offset = 0
+    if embeddings is not None:
+        embeddings_offset = _pad(body, 16)
+        body.extend(embeddings.tobytes())
+    
+    HEADER.pack_into(
+        body, 0, MAGIC, VERSION, flags, len(chunks), dim, len(strings), model_id,
+        strings_index_offset, strings_blob_offset, section_refs_offset, metadata_offset,
+        text_index_offset, text_offset, embeddings_offset
+    )
+    with open(path, "wb") as f:
+        f.write(body)
+    logger.info(f"Wrote {len(chunks)} chunks to {path} ({len(body)} bytes)")
+
+class ChunkCorpus:
+    """Read-only, memory-mapped view of a binary chunk corpus."""
+    
+    def __init__(self, path):
+        """Maps the file and validates its header.
+        
+        Args:
+            path (str): Corpus written by write_chunks.
+        Raises:
+            ValueError: If the file is not a corpus or has an unsupported version.
+        """
+        self.path = path
+        self._mm = None
+        self._file = open(path, "rb")
+        try:
+            # mmap rejects a 0-byte file with ValueError
+            self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            (magic, version, flags, count, dim, string_count, model_id,
+             strings_index_offset, self._strings_blob_offset, section_refs_offset, metadata_offset,
+             text_index_offset, _, embeddings_offset) = HEADER.unpack_from(self._mm, 0)
+        except (ValueError, struct.error):
+            self.close()
+            raise ValueError(f"{path} is too short to be a chunk corpus")
+        if magic != MAGIC:
+            self.close()
+            raise ValueError(f"{path} is not a chunk corpus")
+        if version != VERSION:
+            self.close()
+            raise ValueError(f"Unsupported chunk corpus version {version} in {path}")
+        
+        self.count = count
+        self.version = version
+        self.embeddings = None
+        self.embedding_model = None
+        try:
+            # np.frombuffer raises ValueError when a table runs past the end of the file
+            self._string_index = np.frombuffer(self._mm, "<u8", string_count + 1, strings_index_offset)
+            self.metadata_table = np.frombuffer(self._mm, METADATA_DTYPE, count, metadata_offset)
+            ref_count = int((self.metadata_table["sections_start"] + self.metadata_table["sections_count"]).max()) if count else 0
+            self._section_refs = np.frombuffer(self._mm, "<u4", ref_count, section_refs_offset)
+            self._text_index = np.frombuffer(self._mm, "<u8", count, text_index_offset)
+            
+            if flags & HAS_EMBEDDINGS:
+                dtype = "<f2" if flags & FLOAT16_EMBEDDINGS else "<f4"
+                self.embeddings = np.frombuffer(self._mm, dtype, count * dim, embeddings_offset).reshape(count, dim)
+                self.embedding_model = self.string(model_id)
+        except ValueError:
+            self.close()
+            raise ValueError(f"{path} is too short to be a chunk corpus")
+    
+    def __len__(self):
+        return self.count
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        self.close()
+    
+    def string(self, string_id):
+        """Returns a label from the string table, or None for the missing sentinel."""
+        if string_id == NO_STRING:
+            return None
+        start = self._strings_blob_offset + int(self._string_index[string_id])
+        end = self._strings_blob_offset + int(self._string_index[string_id + 1])
+        return self._mm[start:end].decode("utf-8")
+    
+    def text(self, i):
+        """Returns the content of chunk i."""
+        offset = int(self._text_index[i])
+        (length,) = struct.unpack_from("<I", self._mm, offset)
+        return self._mm[offset + 4:offset + 4 + length].decode("utf-8")
+    
+    def metadata(self, i):
+        """Returns the metadata of chunk i in the same shape as the JSON format."""
+        record = self.metadata_table[i]
+        start = int(record["sections_start"])
+        refs = self._section_refs[start:start + int(record["sections_count"])]
+        return {
+            "chapter": self.string(int(record["chapter"])),
+            "part": self.string(int(record["part"])),
+            "sections": [self.string(int(ref)) for ref in refs],
+            "page_start": None if record["page_start"] == NO_PAGE else int(record["page_start"]),
+            "page_end": None if record["page_end"] == NO_PAGE else int(record["page_end"]),
+            "is_fundamental_rights": int(record["is_fundamental_rights"])
+        }
+    
+    def __iter__(self):
+        for i in range(self.count):
+            yield {"content": self.text(i), "metadata": self.metadata(i)}
+    
+    def buffer(self):
+        """Returns the raw mapped bytes, e.g. for fingerprinting."""
+        return self._mm
+    
+    def close(self):
+        """Releases the numpy views, the mapping and the file."""
+        self._string_index = self.metadata_table = self._section_refs = self._text_index = None
+        self.embeddings = None
+        if self._mm is not None:
+            self._mm.close()
+            self._mm = None
+        self._file.close()
+
+def read_chunks(path):
+    """Loads all chunks from a JSON file or a binary corpus into dicts.
+    
+    Args:
+        path (str): constitution_chunks.json-style JSON or a corpus from write_chunks.
+    Returns:
+        list: Dicts with "content" and "metadata".
+    """
+    if path.endswith(".json"):
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    with ChunkCorpus(path) as corpus:
+        return list(corpus)
+
+def convert(input_path, output_path, embed=False, dtype="float16"):
+    """Writes a binary corpus from JSON chunks or from an existing corpus.
+    
+    Reading an existing corpus lets embeddings be added to (or refreshed in)
+    constitution_chunks.bin in place.
+    
+    Args:
+        input_path (str): JSON chunks or binary corpus to read.
+        output_path (str): Binary corpus to write; may be the same as input_path.
+        embed (bool): Also compute and store embeddings with settings.EMBEDDING_MODEL.
+        dtype (str): "float16" or "float32" storage for embeddings.
+    """
+    # Fully read (and unmap) the input first so it can be overwritten
+    chunks = read_chunks(input_path)
+    
+    embeddings = None
+    embedding_model = None
+    if embed:
+        # Imported lazily, only needed when embeddings are precomputed
+        from sentence_transformers import SentenceTransformer
+        from config.settings import settings
+        
+        cache_dir = os.path.join(os.getcwd(), ".cache", "models")
+        model = SentenceTransformer(settings.EMBEDDING_MODEL, cache_folder=cache_dir)
+        embeddings = model.encode([chunk["content"] for chunk in chunks])
+        embedding_model = settings.EMBEDDING_MODEL
+    
+    write_chunks(chunks, output_path, embeddings=embeddings, embedding_model=embedding_model, dtype=dtype)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Convert chunks to the binary corpus format, optionally with embeddings")
+    parser.add_argument("input_path", nargs="?", default="constitution_chunks.bin",
+                        help="JSON chunks or an existing binary corpus")
+    parser.add_argument("output_path", nargs="?", default=None, help="Defaults to overwriting input_path")
+    parser.add_argument("--embed", action="store_true", help="Precompute and store embeddings")
+    parser.add_argument("--dtype", choices=["float16", "float32"], default="float16")
+    args = parser.parse_args()
+    output_path = args.output_path or args.input_path
+    if output_path.endswith(".json"):
+        parser.error("output_path must be a binary corpus, not .json")
+    convert(args.input_path, output_path, embed=args.embed, dtype=args.dtype)
+    print(f"Converted {args.input_path} to {output_path}")
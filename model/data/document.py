@@ -7,13 +7,16 @@ import sys
 import os
 from utils.logger import logger
 import time
-import json
 
 # Dynamically adjust path to include project root when run directly
 if __name__ == "__main__":
     sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
 
 from config.settings import settings
+from model.data.chunk_format import write_chunks
+
+# Ordinals used in schedule headings ("FIRST SCHEDULE", "SECOND SCHEDULE", ...)
+ORDINALS = ("FIRST", "SECOND", "THIRD", "FOURTH", "FIFTH", "SIXTH", "SEVENTH")
 
 class DocumentManager:
     """Manages document extraction and chunking for LEXAI."""
@@ -63,63 +66,199 @@ class DocumentManager:
             logger.error(f"Extraction failed: {str(e)}")
             raise
     
-    def chunk_document(self, content):
-        """Splits text into chunks with overlap for vector storage."""
-        logger.info(f"Chunking document with {len(content.split())} words")
-        words = content.split()
-        total_words = len(words)
-        chunks = []
+    def _window(self, words):
+        """Splits a list of words into overlapping windows of chunk_size words."""
+        windows = []
         start = 0
         effective_step = self.chunk_size - self.overlap
+        total_words = len(words)
         
         while start < total_words:
             end = min(start + self.chunk_size, total_words)
             if end - start < self.chunk_size * 0.5:
-                chunk = ' '.join(words[start:end])
-                if chunk.strip():
-                    chunks.append(chunk)
+                if words[start:end]:
+                    windows.append(words[start:end])
                 break
-            chunk = ' '.join(words[start:end])
-            chunks.append(chunk)
+            windows.append(words[start:end])
             start += effective_step
+        return windows
+    
+    def split_units(self, content):
+        """Splits text into structural units at chapter, part, schedule and section headings.
+        
+        Each unit carries the chapter, part and section it belongs to plus the
+        pages it spans, so chunks never straddle a boundary unless packed on purpose.
+        """
+        # Some headings are glued to their title (e.g. "100.Mode of exercising")
+        content = re.sub(r'(?<![\d.])(\d{1,3}[A-Z]?)\.(?=[A-Z])', r'\1. ', content)
+        words = content.split()
+        
+        units = []
+        chapter = "PREAMBLE"
+        part = None
+        section = None
+        page = None
+        last_section = 0
+        in_schedules = False
+        restart_at = None
+        
+        for i, word in enumerate(words):
+            prev_word = words[i - 1] if i > 0 else ""
+            next_word = words[i + 1] if i + 1 < len(words) else ""
+            boundary = False
+            
+            # Track page markers inserted by extract_from_pdf ("PAGE 54:")
+            if word == "PAGE" and re.match(r'^\d+:$', next_word):
+                page = int(next_word[:-1])
+            
+            if word == "CHAPTER" and re.match(r'^[IVX]+$', next_word):
+                chapter = f"CHAPTER {next_word}"
+                part = None
+                section = None
+                in_schedules = False
+                boundary = True
+            elif word == "PART" and re.match(r'^[IVX]+$', next_word):
+                part = f"PART {next_word}"
+                section = None
+                boundary = True
+            elif word in ORDINALS and next_word == "SCHEDULE":
+                chapter = f"{word} SCHEDULE"
+                part = None
+                section = None
+                in_schedules = True
+                boundary = True
+            elif word == "SCHEDULES":
+                in_schedules = True
+            else:
+                # Section headings look like "33. Right to life" and number sequentially;
+                # schedules restart their own numbered paragraphs, so they are ignored
+                section_match = re.match(r'^(\d{1,3})([A-Z]?)\.$', word)
+                if (section_match and not in_schedules and next_word[:1].isupper()
+                        and prev_word.lower() not in ("section", "sections", "item")):
+                    number = int(section_match.group(1))
+                    if number == 1 and last_section > 1:
+                        # Numbering restarted: everything so far was the arrangement of sections
+                        restart_at = len(units)
+                        last_section = 0
+                    if last_section < number <= last_section + 3 or (section_match.group(2) and number == last_section):
+                        section = section_match.group(1) + section_match.group(2)
+                        last_section = number
+                        boundary = True
+            
+            if boundary or not units:
+                units.append({
+                    "words": [],
+                    "chapter": chapter,
+                    "part": part,
+                    "section": section,
+                    "pages": [],
+                    "is_arrangement": False
+                })
+            units[-1]["words"].append(word)
+            units[-1]["pages"].append(page)
+        
+        if restart_at is not None:
+            # Keep the headings that lead into section 1 with the body text
+            while restart_at > 0 and units[restart_at - 1]["section"] is None:
+                restart_at -= 1
+            for unit in units[:restart_at]:
+                unit["section"] = None
+                unit["is_arrangement"] = True
+        
+        return units
+    
+    def chunk_document(self, content):
+        """Splits text into structure-aware chunks for vector storage.
+        
+        Small consecutive units are packed together up to chunk_size words, a new
+        chunk starts at every chapter or part boundary, and sections longer than
+        chunk_size are windowed with overlap.
+        """
+        logger.info(f"Chunking document with {len(content.split())} words")
+        units = self.split_units(content)
+        chunks = []
+        current = None
+        
+        def flush():
+            if current and current["words"]:
+                chunks.append({
+                    "content": ' '.join(current["words"]),
+                    "metadata": {
+                        "chapter": current["chapter"],
+                        "part": current["part"],
+                        "sections": current["sections"],
+                        "page_start": current["pages"][0],
+                        "page_end": current["pages"][-1],
+                        "is_fundamental_rights": 1 if current["chapter"] == "CHAPTER IV" else 0
+                    }
+                })
+        
+        for unit in units:
+            sections = [unit["section"]] if unit["section"] else []
+            oversized = len(unit["words"]) > self.chunk_size
+            if current is not None:
+                # Bare headings are carried into the next chunk instead of standing alone
+                boundary_changed = (
+                    (unit["chapter"], unit["part"]) != (current["chapter"], current["part"])
+                    and (current["sections"] or len(current["words"]) >= self.chunk_size * 0.25)
+                )
+                too_long = len(current["words"]) + len(unit["words"]) > self.chunk_size
+                if oversized and not current["sections"]:
+                    too_long = False
+                if boundary_changed or unit["is_arrangement"] != current["is_arrangement"] or too_long:
+                    flush()
+                    current = None
+            
+            if oversized:
+                # Oversized section: window it on its own, carrying any pending headings along
+                words = (current["words"] if current else []) + unit["words"]
+                pages = (current["pages"] if current else []) + unit["pages"]
+                step = self.chunk_size - self.overlap
+                for n, window in enumerate(self._window(words)):
+                    start = n * step
+                    current = dict(unit, words=window, sections=sections, pages=pages[start:start + len(window)])
+                    flush()
+                current = None
+                continue
+            
+            if current is None:
+                current = dict(unit, words=list(unit["words"]), pages=list(unit["pages"]), sections=sections)
+            else:
+                current["words"].extend(unit["words"])
+                current["pages"].extend(unit["pages"])
+                current["sections"] = current["sections"] + sections
+                current["chapter"] = unit["chapter"]
+                current["part"] = unit["part"]
+        flush()
+        
+        logger.info(f"Created {len(chunks)} chunks")
         return chunks
     
-    def preprocess(self):
-        """Runs the full preprocessing pipeline."""
+    def preprocess(self, output_path=settings.CHUNKS_PATH):
+        """Runs the full preprocessing pipeline and writes the binary chunk corpus.
+        
+        Args:
+            output_path (str): Corpus file to write, None to skip writing.
+        Returns:
+            list: The chunks, as dicts with "content" and "metadata".
+        """
         logger.info("Starting preprocessing pipeline")
         raw_text = self.extract_from_pdf()
         chunks = self.chunk_document(raw_text)
         
-        # Add section tracking
-        tagged_chunks = []
-        current_chapter = "PREAMBLE"
+        sectioned = sum(1 for chunk in chunks if chunk["metadata"]["sections"])
+        logger.info(f"{sectioned} of {len(chunks)} chunks carry section numbers")
         
-        for chunk in chunks:
-            # Detect chapter headers
-            chapter_match = re.search(r'CHAPTER [IVX]+', chunk)
-            if chapter_match:
-                current_chapter = chapter_match.group(0)
-            
-            # Preserve metadata
-            tagged_chunks.append({
-                "content": chunk,
-                "metadata": {
-                    "chapter": current_chapter,
-                    "is_fundamental_rights": 1 if "CHAPTER IV" in current_chapter else 0
-                }
-            })
-        
-        return tagged_chunks
+        if output_path:
+            write_chunks(chunks, output_path)
+        return chunks
 
 if __name__ == "__main__":
     logger.info("Executing document preprocessing")
     dm = DocumentManager()
     try:
         chunks = dm.preprocess()
-        with open("constitution_chunks.json", "w", encoding="utf-8") as f:
-            json.dump(chunks, f, ensure_ascii=False, indent=2)
-        logger.info(f"Saved {len(chunks)} chunks to constitution_chunks.json")
-        print(f"Extracted and saved {len(chunks)} chunks")
+        print(f"Extracted and saved {len(chunks)} chunks to {settings.CHUNKS_PATH}")
     except Exception as e:
         logger.error(f"Preprocessing failed: {str(e)}")
         print(f"Error: {str(e)}")
\ No newline at end of file
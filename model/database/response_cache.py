@@ -0,0 +1,167 @@
+# Purpose: Caches LLM responses in SQLite, keyed by the query and the chunks retrieved for it.
+# Why: Different phrasings often retrieve the same chunks, so the same answer can be reused
+#      instead of paying for another LLM call. SQLite keeps the cache across restarts.
+
+import hashlib
+import json
+import re
+import sqlite3
+import threading
+import time
+from utils.logger import logger
+
+class ResponseCache:
+    """Persistent LRU/TTL cache of LLM responses."""
+    
+    def __init__(self, db_path, fingerprint, max_entries=5000, ttl=7 * 24 * 3600):
+        """Opens the cache and drops it if the index or system prompt changed.
+        
+        Args:
+            db_path (str): Path to the SQLite database file.
+            fingerprint (str): Hash of the chunk index and system prompt; entries
+                written under a different fingerprint are invalidated.
+            max_entries (int): Maximum number of cached responses (LRU eviction).
+            ttl (int): Seconds a cached response stays valid.
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.hits = 0
+        self.misses = 0
+        self.saved_tokens = 0
+        self.saved_seconds = 0.0
+        self.create_tables()
+        self.check_fingerprint(fingerprint)
+    
+    def create_tables(self):
+        """Creates the cache and metadata tables if they don't exist."""
+        with self.lock:
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS response_cache (
+                    cache_key TEXT PRIMARY KEY,
+                    response TEXT NOT NULL,
+                    tokens INTEGER NOT NULL DEFAULT 0,
+                    latency REAL NOT NULL DEFAULT 0,
+                    hits INTEGER NOT NULL DEFAULT 0,
+                    created_at REAL NOT NULL,
+                    last_accessed REAL NOT NULL
+                )
+            """)
+            self.conn.execute("""
+                CREATE INDEX IF NOT EXISTS idx_response_cache_last_accessed
+                ON response_cache (last_accessed)
+            """)
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS cache_meta (
+                    key TEXT PRIMARY KEY,
+                    value TEXT NOT NULL
+                )
+            """)
+            self.conn.commit()
+    
+    def check_fingerprint(self, fingerprint):
+        """Clears all entries when the index or system prompt fingerprint changed."""
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT value FROM cache_meta WHERE key = 'fingerprint'"
+            ).fetchone()
+            if row is None or row[0] != fingerprint:
+                if row is not None:
+                    logger.info("Index or system prompt changed, invalidating response cache")
+                self.conn.execute("DELETE FROM response_cache")
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO cache_meta (key, value) VALUES ('fingerprint', ?)",
+                    (fingerprint,)
+                )
+                self.conn.commit()
+    
+    @staticmethod
+    def make_key(query, chunk_ids, model_name):
+        """Builds the canonical intent key for a query.
+        
+        Args:
+            query (str): User's question; case, punctuation and spacing are ignored.
+            chunk_ids (list): Ids of the retrieved chunks; order is ignored.
+            model_name (str): LLM the response comes from.
+        Returns:
+            str: Hex digest identifying the cache entry.
+        """
+        normalized = ' '.join(re.sub(r'[^\w\s]', ' ', query.lower()).split())
+        payload = json.dumps([normalized, sorted(chunk_ids), model_name])
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+    
+    def get(self, cache_key):
+        """Returns the cached response for a key, or None on a miss or expired entry."""
+        now = time.time()
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT response, tokens, latency, created_at FROM response_cache WHERE cache_key = ?",
+                (cache_key,)
+            ).fetchone()
+            if row is None or now - row[3] > self.ttl:
+                if row is not None:
+                    self.conn.execute("DELETE FROM response_cache WHERE cache_key = ?", (cache_key,))
+                    self.conn.commit()
+                self.misses += 1
+                return None
+            
+            self.conn.execute(
+                "UPDATE response_cache SET hits = hits + 1, last_accessed = ? WHERE cache_key = ?",
+                (now, cache_key)
+            )
+            self.conn.commit()
+            self.hits += 1
+            self.saved_tokens += row[1]
+            self.saved_seconds += row[2]
+            return row[0]
+    
+    def put(self, cache_key, response, tokens=0, latency=0.0):
+        """Stores a response and evicts the least recently used entries over the cap.
+        
+        Args:
+            cache_key (str): Key from make_key.
+            response (str): Raw LLM response.
+            tokens (int): Tokens the LLM call used, counted as saved on each hit.
+            latency (float): Seconds the LLM call took, counted as saved on each hit.
+        """
+        now = time.time()
+        with self.lock:
+            self.conn.execute("""
+                INSERT OR REPLACE INTO response_cache
+                (cache_key, response, tokens, latency, hits, created_at, last_accessed)
+                VALUES (?, ?, ?, ?, 0, ?, ?)
+            """, (cache_key, response, tokens, latency, now, now))
+            self.conn.execute("DELETE FROM response_cache WHERE created_at < ?", (now - self.ttl,))
+            self.conn.execute("""
+                DELETE FROM response_cache WHERE cache_key IN (
+                    SELECT cache_key FROM response_cache
+                    ORDER BY last_accessed DESC LIMIT -1 OFFSET ?
+                )
+            """, (self.max_entries,))
+            self.conn.commit()
+    
+    def stats(self):
+        """Reports hit rate and LLM cost saved.
+        
+        Returns:
+            dict: Counters for this process plus lifetime totals of stored entries.
+        """
+        with self.lock:
+            entries, lifetime_hits, lifetime_tokens, lifetime_seconds = self.conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(hits), 0), COALESCE(SUM(hits * tokens), 0), "
+                "COALESCE(SUM(hits * latency), 0) FROM response_cache"
+            ).fetchone()
+        lookups = self.hits + self.misses
+        return {
+            "entries": entries,
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "saved_tokens": self.saved_tokens,
+            "saved_seconds": round(self.saved_seconds, 3),
+            "lifetime_hits": lifetime_hits,
+            "lifetime_saved_tokens": lifetime_tokens,
+            "lifetime_saved_seconds": round(lifetime_seconds, 3)
+        }
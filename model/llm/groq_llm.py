@@ -59,7 +59,7 @@ class GroqLLM:
     
     def __init__(self):
         self.api_key = settings.OPENROUTER_API_KEY
-        self.base_url = "https://openrouter.ai/api/v1/chat/completions"
+        self.base_url = settings.OPENROUTER_BASE_URL
         self.headers = {
             "Authorization": f"Bearer {self.api_key}",
             "Content-Type": "application/json"
@@ -71,6 +71,12 @@ class GroqLLM:
             "deepseek/deepseek-chat",  # Fallback 1
             "deepseek/deepseek-r1:free"  # Fallback 2, if Groq API key is set up
         ]
+        # Primary model; only its answers are cached under its name
+        self.model_name = settings.MODEL_NAME
+        # Token usage reported for the last successful call, used for cache savings
+        self.last_usage = {}
+        # Model that actually answered the last call (may be a fallback)
+        self.last_model = None
     
     def predict(self, messages):
         """Generates a response using OpenRouter's DeepSeek API with fallbacks."""
@@ -93,7 +99,10 @@ class GroqLLM:
                 )
                 response.raise_for_status()
                 logger.info(f"Successfully used model: {model}")
-                return response.json()["choices"][0]["message"]["content"]
+                data = response.json()
+                self.last_usage = data.get("usage") or {}
+                self.last_model = model
+                return data["choices"][0]["message"]["content"]
             except Exception as e:
                 logger.warning(f"Model {model} failed: {str(e)}")
                 if 'response' in locals():
@@ -1,18 +1,23 @@
 import logging
+import time
 
 logger = logging.getLogger("LEXAI")
 
+# System prompt shared by every session; part of the response cache fingerprint
+SYSTEM_PROMPT = """You are LEXAI, an AI legal assistant for Nigerian law.
+                                 Answer queries based on the Nigerian Constitution.
+                                 Be casual, clear, and always explain your reasoning.
+                                 If unsure, say 'I need more data.'"""
+
 class LEXAIRagAgent:
     """Custom RAG agent implementation."""
     
-    def __init__(self, llm, vector_store):
+    def __init__(self, llm, vector_store, response_cache=None):
         self.llm = llm
         self.vector_store = vector_store
+        self.response_cache = response_cache
         self.conversation = []
-        self.system_context = """You are LEXAI, an AI legal assistant for Nigerian law.
-                                 Answer queries based on the Nigerian Constitution.
-                                 Be casual, clear, and always explain your reasoning.
-                                 If unsure, say 'I need more data.'"""
+        self.system_context = SYSTEM_PROMPT
         
         # Initialize with system message
         self.add_message({"role": "system", "content": self.system_context})
@@ -25,9 +30,21 @@ class LEXAIRagAgent:
         if len(self.conversation) > 10:
             self.conversation = self.conversation[-10:]
     
-    def execute(self, query, context=None):
-        """Executes a query using the provided context."""
+    def execute(self, query, context=None, cache_key=None):
+        """Executes a query using the provided context.
+        
+        When a response cache and cache_key are given, a cached answer for the
+        same intent is reused instead of calling the LLM. The cache is only used
+        on a session's first turn: later answers depend on the earlier turns,
+        which the key does not cover.
+        """
         try:
+            # Decide before this turn's messages are added
+            use_cache = (
+                self.response_cache is not None and cache_key is not None
+                and not any(m["role"] in ("user", "assistant") for m in self.conversation)
+            )
+            
             # Add context if provided
             if context and context.strip():
                 self.add_message({
@@ -38,8 +55,33 @@ class LEXAIRagAgent:
             # Add user query
             self.add_message({"role": "user", "content": query})
             
-            # Generate response
-            response = self.llm.predict(self.conversation)
+            # Reuse a cached answer for the same query and chunks if there is one
+            response = None
+            if use_cache:
+                # A broken cache (locked or read-only database, full disk) must never fail the query
+                try:
+                    response = self.response_cache.get(cache_key)
+                except Exception as e:
+                    logger.warning(f"Response cache lookup failed, calling the LLM: {str(e)}")
+            
+            if response is None:
+                # Generate response
+                started = time.perf_counter()
+                response = self.llm.predict(self.conversation)
+                # Fallback models answer under the primary model's key, so skip them
+                if use_cache and self.llm.last_model == self.llm.model_name:
+                    usage = getattr(self.llm, "last_usage", {}) or {}
+                    try:
+                        self.response_cache.put(
+                            cache_key,
+                            response,
+                            tokens=usage.get("total_tokens", 0),
+                            latency=time.perf_counter() - started
+                        )
+                    except Exception as e:
+                        logger.warning(f"Could not store response in cache: {str(e)}")
+            else:
+                logger.info("Served response from cache")
             
             # Add assistant response to conversation
             self.add_message({"role": "assistant", "content": response})
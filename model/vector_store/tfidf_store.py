@@ -4,12 +4,16 @@
 from swarmauri.standard.documents.concrete.Document import Document
 import json
 import os
+import hashlib
 import numpy as np
 import faiss
 import re
 from rank_bm25 import BM25Okapi
 from sentence_transformers import SentenceTransformer
 from utils.logger import logger
+from utils.profiler import track_allocations
+from config.settings import settings
+from model.data.chunk_format import ChunkCorpus
 from swarmauri.standard.vector_stores.base.VectorStoreBase import VectorStoreBase
 
 
@@ -46,7 +50,7 @@ class HybridVectorStore(VectorStoreBase):
 class VectorStoreManager:
     """Handles hybrid vector store with dense and sparse retrieval."""
     
-    def __init__(self, json_path="constitution_chunks.json"):
+    def __init__(self, chunks_path=settings.CHUNKS_PATH):
         """Initializes hybrid vector store."""
         print("Initializing Hybrid Vector Store")
         
@@ -56,7 +60,7 @@ class VectorStoreManager:
         
         # Use efficient MiniLM model (small download)
         self.model = SentenceTransformer(
-            'all-MiniLM-L6-v2',
+            settings.EMBEDDING_MODEL,
             cache_folder=cache_dir
         )
         self.dimension = 384
@@ -67,55 +71,104 @@ class VectorStoreManager:
         self.doc_texts = []
         
         self.documents = []
-        self.json_path = json_path
+        self.chunks_path = chunks_path
         
-        if os.path.exists(json_path):
-            print(f"Found {json_path}, loading...")
-            self.load_and_populate()
+        # Direct section number -> chunk ids lookup for citation-style queries
+        self.section_index = {}
+        
+        # Hash of the loaded chunk file, changes whenever the index is rebuilt
+        self.index_fingerprint = ""
+        
+        # Allocation sites of the last index build, when PROFILE_INDEX_ALLOCATIONS is on
+        self.allocation_report = None
+        
+        if os.path.exists(chunks_path):
+            print(f"Found {chunks_path}, loading...")
+            if settings.PROFILE_INDEX_ALLOCATIONS:
+                with track_allocations("load_and_populate") as report:
+                    self.load_and_populate()
+                self.allocation_report = report
+            else:
+                self.load_and_populate()
         else:
-            print(f"Warning: {json_path} not found")
+            print(f"Warning: {chunks_path} not found")
+    
+    def read_chunks(self):
+        """Reads chunk contents, metadata and any precomputed embeddings.
+        
+        The binary corpus is memory-mapped, which removes the JSON parse, but
+        every record is still decoded into a Python string and dict for the
+        Document objects and the mapping is closed afterwards; only stored
+        embeddings skip encoding. JSON is still accepted for files that have
+        not been converted with model.data.chunk_format yet.
+        
+        Returns:
+            tuple: (list of (content, metadata), float32 embeddings or None).
+        """
+        if self.chunks_path.endswith(".json"):
+            with open(self.chunks_path, "rb") as f:
+                raw = f.read()
+            self.index_fingerprint = hashlib.sha256(raw).hexdigest()
+            chunk_data = json.loads(raw.decode("utf-8"))
+            return [(chunk["content"], chunk["metadata"]) for chunk in chunk_data], None
+        
+        with ChunkCorpus(self.chunks_path) as corpus:
+            self.index_fingerprint = hashlib.sha256(corpus.buffer()).hexdigest()
+            chunk_data = [(corpus.text(i), corpus.metadata(i)) for i in range(len(corpus))]
+            embeddings = None
+            if (corpus.embeddings is not None and corpus.embedding_model == settings.EMBEDDING_MODEL
+                    and corpus.embeddings.shape[1] == self.dimension):
+                # Copy out of the mapping (and up to float32) before it is closed
+                embeddings = np.array(corpus.embeddings, dtype='float32')
+        return chunk_data, embeddings
     
     def load_and_populate(self):
         """Populates both dense and sparse indexes."""
         try:
-            with open(self.json_path, "r", encoding="utf-8") as f:
-                chunk_data = json.load(f)
+            chunk_data, precomputed = self.read_chunks()
             
-            print(f"Loading {len(chunk_data)} chunks")
+            print(f"Loading {len(chunk_data)} chunks"
+                  + (" with precomputed embeddings" if precomputed is not None else ""))
             
             self.documents = []
             embeddings = []
             self.doc_texts = []
+            self.section_index = {}
             
-            for idx, chunk_dict in enumerate(chunk_data):
-                content = chunk_dict["content"]
-                metadata = chunk_dict["metadata"]
-                
+            for idx, (content, metadata) in enumerate(chunk_data):
                 doc = Document(
                     content=content,
                     metadata={
                         "id": "constitution",
                         "chunk_id": idx,
                         "chapter": metadata.get("chapter", "UNKNOWN"),
+                        "part": metadata.get("part"),
+                        "sections": metadata.get("sections", []),
+                        "page_start": metadata.get("page_start"),
+                        "page_end": metadata.get("page_end"),
                         "is_fundamental_rights": metadata.get("is_fundamental_rights", 0)
                     }
                 )
                 self.documents.append(doc)
                 self.doc_texts.append(content)
                 
-                # Generate embedding
-                embedding = self.model.encode(content)
-                embeddings.append(embedding)
+                for section in metadata.get("sections", []):
+                    self.section_index.setdefault(section, []).append(idx)
+                
+                # Generate embedding unless the corpus already carries one
+                if precomputed is None:
+                    embedding = self.model.encode(content)
+                    embeddings.append(embedding)
             
             # Create dense index
-            embeddings = np.array(embeddings).astype('float32')
+            embeddings = precomputed if precomputed is not None else np.array(embeddings).astype('float32')
             self.index.add(embeddings)
             
             # Create sparse index
             tokenized_corpus = [doc.split() for doc in self.doc_texts]
             self.bm25 = BM25Okapi(tokenized_corpus)
             
-            print(f"Hybrid index created with {len(self.documents)} documents")
+            print(f"Hybrid index created with {len(self.documents)} documents, {len(self.section_index)} sections")
             logger.info(f"Vector store populated with {len(self.documents)} documents")
         except Exception as e:
             print(f"Error loading chunks: {str(e)}")
@@ -134,6 +187,36 @@ class VectorStoreManager:
         best_indices = np.argsort(doc_scores)[::-1][:top_k]
         return [self.documents[i] for i in best_indices]
     
+    def section_lookup(self, query, max_chunks_per_section=None):
+        """Returns chunks for sections cited in the query (e.g. "section 33"), skipping search.
+        
+        Every cited section is returned whole unless max_chunks_per_section is
+        set; a section cut short by that cap is logged, never dropped silently.
+        Returns an empty list when the query cites no known section, so callers
+        can fall back to hybrid retrieval.
+        """
+        citations = re.findall(
+            r'\b(?:sections?|sec\.?|s\.)\s*(\d{1,3}[a-z]?(?![\da-z])(?:\s*(?:,|and|&|or)\s*\d{1,3}[a-z]?(?![\da-z]))*)',
+            query,
+            flags=re.IGNORECASE
+        )
+        results = []
+        seen = set()
+        for citation in citations:
+            for section in re.findall(r'\d{1,3}[a-z]?(?![\da-z])', citation, flags=re.IGNORECASE):
+                chunk_ids = self.section_index.get(section.upper(), [])
+                if max_chunks_per_section is not None and len(chunk_ids) > max_chunks_per_section:
+                    logger.warning(
+                        f"Section {section.upper()} truncated to {max_chunks_per_section} "
+                        f"of {len(chunk_ids)} chunks"
+                    )
+                    chunk_ids = chunk_ids[:max_chunks_per_section]
+                for chunk_id in chunk_ids:
+                    if chunk_id not in seen:
+                        seen.add(chunk_id)
+                        results.append(self.documents[chunk_id])
+        return results
+    
     def hybrid_retrieve(self, query, top_k=10):
         """Combines dense and sparse retrieval results."""
         # Get both result sets
@@ -0,0 +1,7 @@
+# Purpose: Makes the project root importable when running pytest from any directory.
+# Why: The project has no installable package; modules import each other from the root.
+
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
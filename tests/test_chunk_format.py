@@ -0,0 +1,120 @@
+# Purpose: Round-trip tests for the binary chunk corpus format.
+# Why: constitution_chunks.bin is the default corpus; a layout change must not corrupt it silently.
+
+import json
+import os
+import struct
+import numpy as np
+import pytest
+from model.data.chunk_format import ChunkCorpus, HEADER, MAGIC, VERSION, convert, read_chunks, write_chunks
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+CORPUS_PATH = os.path.join(ROOT_DIR, "constitution_chunks.bin")
+
+@pytest.fixture
+def chunks():
+    """Chunks from the shipped corpus, as plain dicts."""
+    return read_chunks(CORPUS_PATH)
+
+def test_shipped_corpus_round_trips(chunks, tmp_path):
+    path = str(tmp_path / "corpus.bin")
+    write_chunks(chunks, path)
+    with ChunkCorpus(path) as corpus:
+        assert len(corpus) == len(chunks)
+        assert list(corpus) == chunks
+        assert corpus.embeddings is None
+
+@pytest.mark.parametrize("dtype, tolerance", [("float16", 1e-3), ("float32", 0)])
+def test_embeddings_round_trip(chunks, tmp_path, dtype, tolerance):
+    path = str(tmp_path / "corpus.bin")
+    embeddings = np.random.default_rng(0).random((len(chunks), 384), dtype=np.float32)
+    write_chunks(chunks, path, embeddings=embeddings, embedding_model="all-MiniLM-L6-v2", dtype=dtype)
+    with ChunkCorpus(path) as corpus:
+        assert list(corpus) == chunks
+        assert corpus.embedding_model == "all-MiniLM-L6-v2"
+        assert corpus.embeddings.shape == (len(chunks), 384)
+        assert np.abs(corpus.embeddings.astype(np.float32) - embeddings).max() <= tolerance
+
+def test_convert_from_json(chunks, tmp_path):
+    json_path = str(tmp_path / "chunks.json")
+    with open(json_path, "w", encoding="utf-8") as f:
+        json.dump(chunks, f, ensure_ascii=False, indent=2)
+    path = str(tmp_path / "corpus.bin")
+    convert(json_path, path)
+    assert read_chunks(path) == chunks
+
+def test_convert_rewrites_corpus_in_place(chunks, tmp_path):
+    path = str(tmp_path / "corpus.bin")
+    write_chunks(chunks, path)
+    convert(path, path)
+    assert read_chunks(path) == chunks
+
+def test_empty_corpus(tmp_path):
+    path = str(tmp_path / "empty.bin")
+    write_chunks([], path)
+    with ChunkCorpus(path) as corpus:
+        assert len(corpus) == 0
+        assert list(corpus) == []
+        assert corpus.embeddings is None
+
+def test_missing_metadata_values_round_trip(tmp_path):
+    path = str(tmp_path / "corpus.bin")
+    chunk = {
+        "content": "Preamble text",
+        "metadata": {
+            "chapter": "PREAMBLE",
+            "part": None,
+            "sections": [],
+            "page_start": None,
+            "page_end": None,
+            "is_fundamental_rights": 0
+        }
+    }
+    write_chunks([chunk], path)
+    assert read_chunks(path) == [chunk]
+
+def _patch_header(path, **fields):
+    """Rewrites header fields of a corpus file in place."""
+    with open(path, "r+b") as f:
+        values = list(HEADER.unpack(f.read(HEADER.size)))
+        names = ["magic", "version"]
+        for name, value in fields.items():
+            values[names.index(name)] = value
+        f.seek(0)
+        f.write(HEADER.pack(*values))
+
+def test_rejects_wrong_magic(chunks, tmp_path):
+    path = str(tmp_path / "corpus.bin")
+    write_chunks(chunks[:3], path)
+    _patch_header(path, magic=b"NOPE")
+    with pytest.raises(ValueError, match="not a chunk corpus"):
+        ChunkCorpus(path)
+
+def test_rejects_unsupported_version(chunks, tmp_path):
+    path = str(tmp_path / "corpus.bin")
+    write_chunks(chunks[:3], path)
+    _patch_header(path, version=VERSION + 1)
+    with pytest.raises(ValueError, match="Unsupported chunk corpus version"):
+        ChunkCorpus(path)
+
+def test_rejects_truncated_file(tmp_path):
+    path = str(tmp_path / "short.bin")
+    with open(path, "wb") as f:
+        f.write(MAGIC + struct.pack("<H", VERSION))
+    with pytest.raises(ValueError, match="too short"):
+        ChunkCorpus(path)
+
+def test_rejects_empty_file(tmp_path):
+    path = str(tmp_path / "empty.bin")
+    open(path, "wb").close()
+    with pytest.raises(ValueError, match="too short"):
+        ChunkCorpus(path)
+
+def test_rejects_truncated_body(chunks, tmp_path):
+    path = str(tmp_path / "corpus.bin")
+    write_chunks(chunks, path)
+    # Keep a valid header but cut the tables it points at
+    with open(path, "r+b") as f:
+        f.truncate(HEADER.size + 64)
+    with pytest.raises(ValueError, match="too short"):
+        ChunkCorpus(path)
@@ -0,0 +1,121 @@
+# Purpose: Low-overhead CPU and allocation profiling for LEXAI.
+# Why: Timings say *that* retrieval or index building is slow; sampled stacks and
+#      allocation sites say *why*. Nothing runs unless a profile is requested.
+
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from contextlib import contextmanager
+from utils.logger import logger
+
+class StackSampler:
+    """Samples Python stacks from a background thread and folds them for flame graphs."""
+    
+    def __init__(self, interval=0.005, thread_ids=None):
+        """Configures the sampler.
+        
+        Args:
+            interval (float): Seconds between samples.
+            thread_ids (set): Threads to sample; None samples every thread but the sampler.
+        """
+        self.interval = interval
+        self.thread_ids = thread_ids
+        self.stacks = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = None
+    
+    def start(self):
+        """Starts sampling in a daemon thread."""
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="lexai-profiler", daemon=True)
+        self._thread.start()
+        return self
+    
+    def stop(self):
+        """Stops sampling and returns the folded stack counts."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        return self.stacks
+    
+    def _run(self):
+        own_id = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id or (self.thread_ids is not None and thread_id not in self.thread_ids):
+                    continue
+                self.stacks[self._fold(frame)] += 1
+            self.samples += 1
+    
+    @staticmethod
+    def _fold(frame):
+        """Turns a frame into a root-first, semicolon separated stack."""
+        names = []
+        while frame is not None:
+            code = frame.f_code
+            names.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+            frame = frame.f_back
+        return ";".join(reversed(names))
+    
+    def collapsed(self):
+        """Returns the samples in collapsed-stack format (one "stack count" per line)."""
+        return "\n".join(f"{stack} {count}" for stack, count in self.stacks.most_common())
+
+def capture_profile(seconds, interval=0.005):
+    """Samples every thread for the given number of seconds.
+    
+    Args:
+        seconds (float): How long to sample.
+        interval (float): Seconds between samples.
+    Returns:
+        str: Collapsed stacks, ready for flamegraph.pl or speedscope.
+    """
+    sampler = StackSampler(interval=interval).start()
+    time.sleep(seconds)
+    sampler.stop()
+    logger.info(f"Captured CPU profile: {sampler.samples} samples over {seconds}s")
+    return sampler.collapsed()
+
+@contextmanager
+def profile_current_thread(interval=0.005):
+    """Samples only the calling thread while the block runs; yields the sampler."""
+    sampler = StackSampler(interval=interval, thread_ids={threading.get_ident()}).start()
+    try:
+        yield sampler
+    finally:
+        sampler.stop()
+
+@contextmanager
+def track_allocations(label, top_n=10):
+    """Records peak memory and the top allocation sites of a block with tracemalloc.
+    
+    Args:
+        label (str): Name used in the log line.
+        top_n (int): Number of allocation sites to keep.
+    Yields:
+        dict: Filled with "peak_bytes" and "top" once the block finishes.
+    """
+    report = {"label": label, "peak_bytes": None, "top": []}
+    already_tracing = tracemalloc.is_tracing()
+    if not already_tracing:
+        tracemalloc.start()
+    tracemalloc.reset_peak()
+    try:
+        yield report
+    finally:
+        snapshot = tracemalloc.take_snapshot()
+        report["peak_bytes"] = tracemalloc.get_traced_memory()[1]
+        if not already_tracing:
+            tracemalloc.stop()
+        for stat in snapshot.statistics("lineno")[:top_n]:
+            frame = stat.traceback[0]
+            report["top"].append({
+                "location": f"{frame.filename}:{frame.lineno}",
+                "size_bytes": stat.size,
+                "count": stat.count
+            })
+        logger.info(f"{label}: peak traced memory {report['peak_bytes'] / 1024 / 1024:.1f} MiB")
@@ -1,10 +1,18 @@
 # Purpose: Defines FastAPI endpoints for LEXAI's API.
 # Why: Explicitly separates API logic for clarity and deployment.
 
-from fastapi import FastAPI, HTTPException
+import hmac
+import random
+import time
+from collections import deque
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 from controller.query_handler import QueryHandler
 from pydantic import BaseModel
+from config.settings import settings
+from utils.profiler import capture_profile, profile_current_thread
+from utils.logger import logger
 
 # Pydantic model for the query request
 class QueryRequest(BaseModel):
@@ -26,12 +34,36 @@ app.add_middleware(
 # Instantiate query handler
 query_handler = QueryHandler()
 
+# Most recent per-request profiles, served by /admin/profile/requests
+recent_profiles = deque(maxlen=20)
+
+def is_admin(request):
+    """Checks the X-Admin-Token header against settings.ADMIN_TOKEN."""
+    # Constant-time comparison so the token can't be recovered from response timings;
+    # compared as bytes because compare_digest rejects non-ASCII str
+    return bool(settings.ADMIN_TOKEN) and hmac.compare_digest(
+        request.headers.get("X-Admin-Token", "").encode("utf-8"),
+        settings.ADMIN_TOKEN.encode("utf-8")
+    )
+
+def require_admin(request):
+    """Rejects requests without a valid admin token."""
+    if not settings.ADMIN_TOKEN:
+        raise HTTPException(status_code=404, detail="Admin endpoints are disabled")
+    if not is_admin(request):
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+
 @app.post("/query")
-async def query_endpoint(request: QueryRequest):
+async def query_endpoint(request: QueryRequest, http_request: Request):
     """Handles user queries via POST request.
     
+    A request is profiled when it carries X-LEXAI-Profile with a valid admin
+    token (the collapsed stacks are returned in the response) or when it is
+    picked by PROFILE_SAMPLE_RATE (the stacks are kept for /admin/profile/requests).
+    
     Args:
         request (QueryRequest): The legal question and session ID.
+        http_request (Request): Raw request, used for the profiling headers.
     Returns:
         dict: Query and response.
     Raises:
@@ -41,12 +73,88 @@ async def query_endpoint(request: QueryRequest):
     session_id = request.session_id
     if not query.strip():
         raise HTTPException(status_code=400, detail="Query cannot be empty")
+    requested = "X-LEXAI-Profile" in http_request.headers and is_admin(http_request)
+    sampled = settings.PROFILE_SAMPLE_RATE > 0 and random.random() < settings.PROFILE_SAMPLE_RATE
     try:
-        response = query_handler.handle_query(session_id, query)
+        if not (requested or sampled):
+            response = query_handler.handle_query(session_id, query)
+            return {"query": query, "response": response}
+        
+        started = time.perf_counter()
+        with profile_current_thread(settings.PROFILE_INTERVAL) as sampler:
+            response = query_handler.handle_query(session_id, query)
+        profile = {
+            "session_id": session_id,
+            "query": query,
+            "duration_s": round(time.perf_counter() - started, 4),
+            "samples": sampler.samples,
+            "stacks": sampler.collapsed()
+        }
+        recent_profiles.append(profile)
+        logger.info(f"Profiled query in {profile['duration_s']}s with {profile['samples']} samples")
+        if requested:
+            return {"query": query, "response": response, "profile": profile}
         return {"query": query, "response": response}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error: {str(e)}")
 
+@app.get("/cache/stats")
+async def cache_stats():
+    """Reports response cache hit rate and LLM cost saved.
+    
+    Returns:
+        dict: Cache counters from the query handler, or {"enabled": False} if the
+            cache could not be opened.
+    """
+    if query_handler.response_cache is None:
+        return {"enabled": False}
+    return query_handler.response_cache.stats()
+
+@app.get("/admin/profile", response_class=PlainTextResponse)
+def admin_profile(request: Request, seconds: float = 10, interval: float = None):
+    """Captures a CPU profile of the whole process for a number of seconds.
+    
+    Defined without async so sampling runs in the threadpool while the event
+    loop keeps serving (and is sampled serving) queries.
+    
+    Args:
+        request (Request): Must carry a valid X-Admin-Token header.
+        seconds (float): Capture length, at most 60 seconds.
+        interval (float): Seconds between samples (0.001 to 1), defaults to PROFILE_INTERVAL.
+    Returns:
+        str: Collapsed stacks for flamegraph.pl or speedscope.
+    """
+    require_admin(request)
+    if not 0 < seconds <= 60:
+        raise HTTPException(status_code=400, detail="seconds must be between 0 and 60")
+    if interval is None:
+        interval = settings.PROFILE_INTERVAL
+    # A zero or negative interval would make the sampler spin and stall the server
+    if not 0.001 <= interval <= 1:
+        raise HTTPException(status_code=400, detail="interval must be between 0.001 and 1")
+    return capture_profile(seconds, interval)
+
+@app.get("/admin/profile/requests")
+async def admin_profile_requests(request: Request):
+    """Returns the most recent per-request profiles.
+    
+    Returns:
+        list: Profiles with query, duration and collapsed stacks.
+    """
+    require_admin(request)
+    return list(recent_profiles)
+
+@app.get("/admin/profile/allocations")
+async def admin_profile_allocations(request: Request):
+    """Returns the allocation report of the index build.
+    
+    Returns:
+        dict: Peak traced memory and top allocation sites, or null when
+            PROFILE_INDEX_ALLOCATIONS was off at startup.
+    """
+    require_admin(request)
+    return query_handler.vector_store_manager.allocation_report
+
 @app.get("/health")
 async def health_check():
     """Checks the API's health status.